@@ -1,15 +1,23 @@
-import functools
-import inspect
-from typing import Callable
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Union
 
 from asynqq.event.event import EventType, Event
 from asynqq.event.observer import Observer
 from asynqq.event.subject import Subject
+from asynqq.models.cluster_tasqq import ClusterTasqq
 from asynqq.models.future_tasqq import FutureTasqq
+from asynqq.models.task_adapter import TaskAdapter
 from asynqq.models.tasqq import Tasqq
+from asynqq.pq.aimd_limit import AimdLimit
+from asynqq.pq.clusterqq import Clusterqq
 from asynqq.pq.consumeqq import Consumeqq
+from asynqq.pq.dispatchqq import Dispatchqq
+from asynqq.pq.rate_limiter import RateLimiter
 from asynqq.utils.data_utils import get_short_id
-from asynqq.utils.logger import get_logger
+from asynqq.utils.logger import enable_async_logging, get_logger
 
 
 class Asynqq(Observer):
@@ -17,7 +25,10 @@ class Asynqq(Observer):
     Asynqq class manages tasks in a queue.
     """
 
-    def __init__(self, max_workers=0, task_impl=FutureTasqq, log_level='INFO'):
+    def __init__(self, max_workers=0, task_impl=FutureTasqq, log_level='INFO', dispatchers=1,
+                 rate_limit: Union[RateLimiter, float] = None, lane_limits: dict = None,
+                 concurrency: AimdLimit = None, log_async: bool = False, trace_sample_rate: float = 0.0,
+                 cluster: Clusterqq = None):
         """
         Initializes the Asynqq task manager.
         This constructor sets up the task manager with specified parameters and starts the task processing.
@@ -25,28 +36,69 @@ class Asynqq(Observer):
         :param max_workers: The maximum number of worker threads. Defaults to 0.
         :param task_impl: The task implementation class. Defaults to FutureTasqq.
         :param log_level: The logging level for the task manager. Defaults to 'INFO'.
+        :param dispatchers: The number of dispatcher threads. With more than one, tasks are sharded across
+            work-stealing dispatchers, None uses one per CPU. More dispatchers keep tasks starting while
+            starting a task blocks, e.g. on START callbacks, but do not start trivial tasks faster. Defaults to 1.
+        :param rate_limit: The rate limit for all the tasks, a RateLimiter or calls per second. Defaults to None.
+        :param lane_limits: The rate limits by lane name, RateLimiters or calls per second. Defaults to None.
+        :param concurrency: An adaptive limit that tunes the number of workers from the run time and errors
+            of the tasks, overriding max_workers. Defaults to None.
+        :param log_async: Whether log records are written by a background listener thread, so task threads
+            never block on log I/O. Defaults to False.
+        :param trace_sample_rate: The fraction of tasks whose lifecycle is logged at INFO level with timings.
+            Defaults to 0.0.
+        :param cluster: A cluster of worker processes that runs the tasks as ClusterTasqq, overriding task_impl.
+            Without max_workers, up to twice as many tasks as workers are sent to the cluster. Defaults to None.
 
         :return: None
         """
         self._logger = get_logger(__name__)
         self._logger.setLevel(log_level)
-        self._consumer_thread = Consumeqq(max_workers=max_workers)
+        if log_async:
+            enable_async_logging()
+        self._trace_sample_rate: float = trace_sample_rate
+        self._traced: dict[str, float] = {}
+        self._cluster: Optional[Clusterqq] = cluster
+        if cluster is not None:
+            task_impl = ClusterTasqq
+            # Keep the rest of the tasks in the queue, where they can still be removed or rate limited
+            max_workers = max_workers or 2 * cluster.workers
+        self._concurrency: Optional[AimdLimit] = concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if concurrency is not None:
+            max_workers = concurrency.limit
+            # Pool threads are spawned lazily, so the pool only grows as far as the limit lets tasks start
+            self._executor = ThreadPoolExecutor(max_workers=concurrency.max_limit)
+        if dispatchers == 1:
+            self._consumer_thread = Consumeqq(max_workers=max_workers)
+        else:
+            self._consumer_thread = Dispatchqq(max_workers=max_workers, dispatchers=dispatchers)
         self._task_impl = task_impl
         self._callbacks: dict[str, Subject] = {}
+        self._rate_limiter: Optional[RateLimiter] = RateLimiter.of(rate_limit)
+        self._lane_limits: dict[str, RateLimiter] = {}
+        for lane, limit in (lane_limits or {}).items():
+            self.set_lane_limit(lane, limit)
         self.start()
 
     def start(self):
         """
-        Start the consumer thread.
+        Start the cluster, if any, and the consumer thread.
         """
+        if self._cluster is not None:
+            self._cluster.start()
         self._consumer_thread.start()
 
     def stop(self):
         """
-        Stop the consumer thread and clear the queue.
+        Stop the consumer thread and clear the queue, then stop the cluster, if any.
         """
         self._consumer_thread.stop()
         self._consumer_thread.clear_queue()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if self._cluster is not None:
+            self._cluster.stop()
 
     def get_qq_size(self):
         """
@@ -54,10 +106,27 @@ class Asynqq(Observer):
         """
         return self._consumer_thread.get_queue_size()
 
+    def set_lane_limit(self, lane: str, rate_limit: Union[RateLimiter, float, None]) -> None:
+        """
+        Sets or removes the rate limit of a lane.
+        Tasks added to a lane share its rate limit.
+
+        :param lane: The name of the lane.
+        :param rate_limit: The rate limit, a RateLimiter or calls per second. None removes the limit.
+
+        :return: None
+        """
+        limiter = RateLimiter.of(rate_limit)
+        if limiter is None:
+            self._lane_limits.pop(lane, None)
+        else:
+            self._lane_limits[lane] = limiter
+
     def add(self, func: Callable, idx: str = None, callback: Subject = None, **kwargs) -> Tasqq:
         """
         Adds a task to the task queue.
         This function adds a task to the task queue, optionally associating a callback with it.
+        The task is held back in the queue until the instance rate limit allows it to start.
 
         :param func: The function to be executed as a task.
         :param idx: The identifier for the task. Defaults to None.
@@ -66,12 +135,44 @@ class Asynqq(Observer):
 
         :return Tasqq: The task object that was added to the queue.
         """
+        return self.add_limited(func, kwargs, idx, callback)
+
+    def add_limited(self, func: Callable, kwargs: dict = None, idx: str = None, callback: Subject = None,
+                    lane: str = None, rate_limiter: RateLimiter = None) -> Tasqq:
+        """
+        Adds a task to the task queue, in a lane and with a rate limit.
+        The keyword arguments of the task are passed as a dictionary, so they never collide with the parameters
+        of this function.
+        The task is held back in the queue until the instance, lane and task rate limits allow it to start.
+
+        :param func: The function to be executed as a task.
+        :param kwargs: The keyword arguments for the task. Defaults to None.
+        :param idx: The identifier for the task. Defaults to None.
+        :param callback: The callback function associated with the task. Defaults to None.
+        :param lane: The lane of the task, whose rate limit applies to it. Defaults to None.
+        :param rate_limiter: A rate limiter shared with other tasks. A number of calls per second is refused,
+            it would build a new, full bucket for every task. Defaults to None.
+
+        :return Tasqq: The task object that was added to the queue.
+        """
+        if rate_limiter is not None and not isinstance(rate_limiter, RateLimiter):
+            raise TypeError(f'rate_limiter must be a RateLimiter, got {type(rate_limiter).__name__}')
+        kwargs = kwargs or {}
         idx = str(get_short_id() if idx is None else idx)
         tqq = self._task_impl(idx=idx, func=func, **kwargs)
+        limiters = [self._rate_limiter, self._lane_limits.get(lane), rate_limiter]
+        tqq.rate_limiters = [limiter for limiter in limiters if limiter is not None]
+        if self._executor is not None and isinstance(tqq, FutureTasqq):
+            tqq.executor = self._executor
+        if self._cluster is not None and isinstance(tqq, ClusterTasqq):
+            tqq.cluster = self._cluster
         if callback:
             self._callbacks[idx] = callback
         tqq.attach(self)
-        self._logger.debug(f"Adding task {tqq.idx} to queue")
+        self._logger.debug("Adding task %s to queue", idx)
+        if self._trace_sample_rate and random.random() < self._trace_sample_rate:
+            self._traced[idx] = time.monotonic()
+            self._logger.info("Trace task %s QUEUED", idx)
         self._consumer_thread.add(tqq)
         return tqq
 
@@ -85,6 +186,10 @@ class Asynqq(Observer):
         :return: None
         """
         self._consumer_thread.remove(idx)
+        # A queued task sends no event when removed, drop its trace here
+        queued = self._traced.pop(idx, None)
+        if queued is not None:
+            self._logger.info("Trace task %s REMOVED after %.1f ms", idx, (time.monotonic() - queued) * 1000)
 
     def event_update(self, subject, event: Event) -> None:
         """
@@ -98,45 +203,91 @@ class Asynqq(Observer):
         """
         if event.idx in self._callbacks:
             self._callbacks[event.idx].event_notify(event)
+        debug = self._logger.isEnabledFor(logging.DEBUG)
         if event.e_type == EventType.START:
-            self._logger.debug(f"{event.e_type.name} task with id {event.idx}")
+            if debug:
+                self._logger.debug("%s task with id %s", event.e_type.name, event.idx)
         elif event.e_type == EventType.STOP:
-            self._logger.debug(f"{event.e_type.name} task with id {event.idx}")
-            if event.idx in self._callbacks:
-                del self._callbacks[event.idx]
+            if debug:
+                self._logger.debug("%s task with id %s", event.e_type.name, event.idx)
+            self._callbacks.pop(event.idx, None)
         elif event.e_type == EventType.ERROR:
-            self._logger.error(f"{event.e_type.name} on task {event.idx}: {event.data}")
-            if event.idx in self._callbacks:
-                del self._callbacks[event.idx]
+            self._logger.error("%s on task %s: %s", event.e_type.name, event.idx, event.data)
+            self._callbacks.pop(event.idx, None)
         elif event.e_type == EventType.RESULT:
-            self._logger.debug(f"{event.e_type.name} task {event.idx} completed")
-            if event.idx in self._callbacks:
-                del self._callbacks[event.idx]
+            if debug:
+                self._logger.debug("%s task %s completed", event.e_type.name, event.idx)
+            self._callbacks.pop(event.idx, None)
+        if self._traced:
+            self._trace(event)
+        if self._concurrency is not None:
+            self._update_concurrency(event)
 
-    def task(self, tasqq_id: str = None, callback: Subject = None):
+    def _trace(self, event: Event) -> None:
+        """
+        Logs an event of a sampled task with the time elapsed since the task was queued.
+
+        :param event : The event object to be processed.
+
+        :return: None
+        """
+        queued = self._traced.get(event.idx)
+        if queued is None:
+            return
+        self._logger.info("Trace task %s %s after %.1f ms", event.idx, event.e_type.name,
+                          (time.monotonic() - queued) * 1000)
+        if event.e_type != EventType.START:
+            self._traced.pop(event.idx, None)
+
+    def _update_concurrency(self, event: Event) -> None:
+        """
+        Feeds the adaptive concurrency limit with a task event and applies the new limit to the consumer.
+
+        :param event : The event object to be processed.
+
+        :return: None
+        """
+        if event.e_type == EventType.START:
+            self._concurrency.on_start(event.idx)
+            return
+        if event.e_type == EventType.STOP:
+            self._concurrency.on_cancel(event.idx)
+            return
+        self._concurrency.on_sample(event.idx, event.e_type == EventType.ERROR,
+                                    self._consumer_thread.get_working_size(), self._apply_concurrency)
+
+    def _apply_concurrency(self, previous: int, limit: int) -> None:
+        """
+        Applies a new adaptive concurrency limit to the consumer.
+        Called by the limit while holding its lock, so the consumer always ends with the latest limit.
+
+        :param previous: The previous limit.
+        :param limit: The new limit.
+
+        :return: None
+        """
+        self._logger.debug("Concurrency limit changed from %s to %s", previous, limit)
+        self._consumer_thread.set_max_workers(limit)
+
+    def task(self, tasqq_id: str = None, callback: Subject = None, lane: str = None,
+             rate_limit: Union[RateLimiter, float] = None):
         """
         Decorator for creating and adding tasks to the task queue.
         This function acts as a decorator to create and add tasks to the task queue based on the provided parameters.
 
         :param tasqq_id: The identifier for the task. Defaults to None.
         :param callback: The callback function associated with the task. Defaults to None.
+        :param lane: The lane of the tasks. Defaults to None.
+        :param rate_limit: The rate limit shared by all the calls of the decorated function,
+            a RateLimiter or calls per second. Defaults to None.
 
-        :return decorator: The decorator function for creating and adding tasks.
+        :return decorator: The decorator wrapping functions, methods, classmethods and staticmethods
+            in a TaskAdapter.
         """
 
+        limiter = RateLimiter.of(rate_limit)
+
         def decorator(func):
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                idx = str(get_short_id() if tasqq_id is None else tasqq_id)
-                method = func.__get__(args[0], type(args[0])) if 'self' in inspect.signature(func).parameters else func
-                return self.add(method, idx, callback, **kwargs)
-
-            async def qq_wrapper(*args, **kwargs):
-                w = wrapper(self, *args, **kwargs)
-                r = await w.qq()
-                return r
-
-            wrapper.qq = qq_wrapper
-            return wrapper
+            return TaskAdapter(self, func, tasqq_id, callback, lane, limiter)
 
         return decorator
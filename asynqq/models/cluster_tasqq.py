@@ -0,0 +1,95 @@
+import asyncio
+from typing import Callable, Optional
+
+from asynqq.event.event import EventType
+from asynqq.models.tasqq import Tasqq
+
+
+class ClusterTasqq(Tasqq):
+    """
+    ClusterTasqq is a subclass of Tasqq that represents a task executed by a worker process of a Clusterqq.
+    The function must be importable by the workers, and the kwargs and the result must be picklable.
+    """
+
+    def __init__(self, func, **kwargs):
+        """
+        Initialize a ClusterTasqq instance.
+
+        :param idx: The unique identifier for the task.
+        :param func: The function to be executed by the task.
+        :param kwargs: Additional keyword arguments.
+        """
+        super().__init__(**kwargs)
+        self.cluster = None
+        self.func: Callable = func
+        self.ticket: Optional[int] = None
+
+    def is_running(self) -> bool:
+        """
+        Check if the task is running.
+
+        :return: True if the task is running, False otherwise.
+        """
+        return self.ticket is not None and not self.completed
+
+    def is_completed(self) -> bool:
+        """
+        Check if the task has completed.
+
+        :return: True if the task has completed, False otherwise.
+        """
+        return self.completed
+
+    def start(self) -> None:
+        """
+        Notify the start event, then start the task by submitting it to the cluster.
+        A task that cannot be submitted, e.g. with unpicklable kwargs, is completed with an error.
+        """
+        if self.cluster is None:
+            raise RuntimeError('ClusterTasqq has no cluster')
+        self.event_notify(self._event(EventType.START, None))
+        try:
+            self.ticket = self.cluster.submit(self)
+        except Exception as ex:
+            # The task never reaches a worker, complete it here so qq() does not wait forever
+            self.complete(f'Error on tasqq submit: {ex}', True)
+
+    def stop(self) -> None:
+        """
+        Stop the task, a task already sent to a worker still runs but its result is discarded.
+        Also, notify the stop event.
+        """
+        if self.ticket is not None and not self.completed:
+            self.cluster.cancel(self.ticket)
+        self.completed = True
+        self.event_notify(self._event(EventType.STOP, self.errors))
+
+    def get_result(self) -> object:
+        """
+        Get the result of the task.
+
+        :return: The result of the task.
+        """
+        return self.result
+
+    async def qq(self) -> object:
+        while not self.completed:
+            await asyncio.sleep(0.1)
+        return self.result_view()
+
+    def complete(self, result: object, is_error: bool) -> None:
+        """
+        Complete the task with the result sent back by the cluster, and notify the result or error event.
+
+        :param result: The result of the task, or the error message.
+        :param is_error: Whether the task failed.
+        """
+        try:
+            if is_error:
+                self.add_error(result)
+                self.event_notify(self._event(EventType.ERROR, self.errors))
+            else:
+                self.push_result(result, False)
+        finally:
+            self.completed = True
+            self.detach_all()
@@ -3,7 +3,7 @@ from asyncio import Future
 from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional
 
-from asynqq.event.event import EventType, Event
+from asynqq.event.event import EventType
 from asynqq.models.tasqq import Tasqq
 
 # Create a ThreadPoolExecutor instance
@@ -48,18 +48,11 @@ class FutureTasqq(Tasqq):
 
     def start(self) -> None:
         """
-        Start the task by submitting it to the executor.
-        Also, notify the start event.
+        Notify the start event, then start the task by submitting it to the executor.
         """
+        # Notify before submitting, so the start event always precedes the result event
+        self.event_notify(self._event(EventType.START, None))
         self.future_executor = self.executor.submit(self.run)
-        self.event_notify(
-            Event(
-                self.idx,
-                EventType.START,
-                None,
-                **self.kwargs
-            )
-        )
 
     def stop(self) -> None:
         """
@@ -70,14 +63,7 @@ class FutureTasqq(Tasqq):
             self.future_executor.cancel()
         del self.future_executor
         self.completed = True
-        self.event_notify(
-            Event(
-                self.idx,
-                EventType.STOP,
-                self.errors,
-                **self.kwargs
-            )
-        )
+        self.event_notify(self._event(EventType.STOP, self.errors))
 
     def get_result(self) -> object:
         """
@@ -90,7 +76,7 @@ class FutureTasqq(Tasqq):
     async def qq(self) -> object:
         while not self.completed:
             await asyncio.sleep(0.1)
-        return self.result
+        return self.result_view()
 
     def run(self) -> None:
         """
@@ -106,7 +92,7 @@ class FutureTasqq(Tasqq):
                     if loop.is_closed():
                         raise RuntimeError('loop is closed')
                 except RuntimeError as ex:
-                    self._logger.debug(f'{ex}, creating a new event loop')
+                    self._logger.debug('%s, creating a new event loop', ex)
                     loop = asyncio.new_event_loop()
                     asyncio.set_event_loop(loop)
                 try:
@@ -115,24 +101,10 @@ class FutureTasqq(Tasqq):
                     loop.close()
             else:
                 self.result = self.func(**self.kwargs)
-            self.event_notify(
-                Event(
-                    self.idx,
-                    EventType.RESULT,
-                    self.result,
-                    **self.kwargs
-                )
-            )
+            self.event_notify(self._event(EventType.RESULT, self.result))
         except Exception as ex:
             self.errors.append(str(ex))
-            self.event_notify(
-                Event(
-                    self.idx,
-                    EventType.ERROR,
-                    self.errors,
-                    **self.kwargs
-                )
-            )
+            self.event_notify(self._event(EventType.ERROR, self.errors))
         finally:
             self.completed = True
             self.detach_all()
@@ -0,0 +1,119 @@
+from multiprocessing import shared_memory
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, arrays are then exposed as memoryviews
+    np = None
+
+
+class SharedResult:
+    """
+    SharedResult is a handle on a large task result kept in a shared memory segment.
+    Events and observers pass the handle around instead of the payload, and pickling it only transfers the
+    segment name and layout, so a result produced in another process reaches the caller without being copied
+    through a pipe. view() exposes the payload as a zero-copy memoryview, or as a NumPy array for arrays.
+    The consumer of the result owns the segment and should unlink() it once done.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, size: int, shape: tuple = None, dtype: str = None):
+        """
+        Initialize a SharedResult on an open segment. Use allocate(), create() or pickling to build one.
+
+        :param shm: The shared memory segment.
+        :param size: The size of the payload in bytes.
+        :param shape: The shape of the array payload. Defaults to None.
+        :param dtype: The NumPy dtype string of the array payload. Defaults to None.
+        """
+        self.shm: shared_memory.SharedMemory = shm
+        self.size: int = size
+        self.shape: Optional[tuple] = shape
+        self.dtype: Optional[str] = dtype
+
+    @property
+    def name(self) -> str:
+        """
+        Get the name of the shared memory segment.
+
+        :return: The name of the segment.
+        """
+        return self.shm.name
+
+    @classmethod
+    def allocate(cls, size: int, shape: tuple = None, dtype: str = None) -> 'SharedResult':
+        """
+        Allocate an empty segment, for producers that write their result in place through view().
+
+        :param size: The size of the payload in bytes.
+        :param shape: The shape of the array payload. Defaults to None.
+        :param dtype: The NumPy dtype string of the array payload. Defaults to None.
+        :return: The SharedResult.
+        """
+        # Zero-sized segments are not allowed, the view is still cut to size
+        return cls(shared_memory.SharedMemory(create=True, size=max(size, 1)), size, shape, dtype)
+
+    @classmethod
+    def create(cls, data) -> 'SharedResult':
+        """
+        Copy a bytes-like object or a NumPy array into a new segment.
+
+        :param data: The payload.
+        :return: The SharedResult.
+        """
+        if np is not None and isinstance(data, np.ndarray):
+            result = cls.allocate(data.nbytes, data.shape, data.dtype.str)
+            result.view()[...] = data
+            return result
+        data = memoryview(data).cast('B')
+        result = cls.allocate(data.nbytes)
+        result.view()[:] = data
+        return result
+
+    @classmethod
+    def attach(cls, name: str, size: int, shape: tuple = None, dtype: str = None) -> 'SharedResult':
+        """
+        Attach to an existing segment.
+
+        :param name: The name of the segment.
+        :param size: The size of the payload in bytes.
+        :param shape: The shape of the array payload. Defaults to None.
+        :param dtype: The NumPy dtype string of the array payload. Defaults to None.
+        :return: The SharedResult.
+        """
+        return cls(shared_memory.SharedMemory(name=name), size, shape, dtype)
+
+    def view(self):
+        """
+        Get a zero-copy view of the payload.
+
+        :return: A NumPy array for array payloads when NumPy is available, a memoryview otherwise.
+        """
+        buf = self.shm.buf[:self.size]
+        if self.dtype is not None and np is not None:
+            return np.ndarray(self.shape, dtype=self.dtype, buffer=buf)
+        return buf
+
+    def close(self) -> None:
+        """
+        Close this process' access to the segment. Views must be released first.
+        """
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """
+        Close and destroy the segment.
+        """
+        self.shm.close()
+        self.shm.unlink()
+
+    def __reduce__(self):
+        """
+        Pickle the handle as a reference to the segment.
+        """
+        return self.attach, (self.name, self.size, self.shape, self.dtype)
+
+    def __enter__(self) -> 'SharedResult':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.unlink()
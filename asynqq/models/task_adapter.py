@@ -0,0 +1,131 @@
+import functools
+from typing import Callable, Optional
+
+from asynqq.event.subject import Subject
+from asynqq.models.tasqq import Tasqq
+from asynqq.pq.rate_limiter import RateLimiter
+
+
+class TaskAdapter:
+    """
+    TaskAdapter is the callable returned by the Asynqq.task decorator.
+    The decorated function is analysed once, at decoration time: as a descriptor the adapter binds to the
+    instance for methods and to the class for classmethods, like the function itself would, so calls do not
+    pay for signature introspection. Positional arguments are bound to the function with functools.partial,
+    keyword arguments are passed to the task.
+    The decorator must be applied above @classmethod and @staticmethod.
+    """
+
+    def __init__(self, asynqq, func, tasqq_id: str = None, callback: Subject = None, lane: str = None,
+                 rate_limiter: RateLimiter = None):
+        """
+        Initialize a TaskAdapter.
+
+        :param asynqq: The Asynqq instance the tasks are added to.
+        :param func: The decorated function, classmethod or staticmethod.
+        :param tasqq_id: The identifier for the tasks. Defaults to None.
+        :param callback: The callback associated with the tasks. Defaults to None.
+        :param lane: The lane of the tasks. Defaults to None.
+        :param rate_limiter: The rate limiter shared by the tasks. Defaults to None.
+        """
+        self._binds_class: bool = isinstance(func, classmethod)
+        self._binds_instance: bool = not isinstance(func, (classmethod, staticmethod))
+        self._func: Callable = func if self._binds_instance else func.__func__
+        self._asynqq = asynqq
+        self._tasqq_id: Optional[str] = tasqq_id
+        self._callback: Optional[Subject] = callback
+        self._lane: Optional[str] = lane
+        self._rate_limiter: Optional[RateLimiter] = rate_limiter
+        functools.update_wrapper(self, self._func)
+
+    def __get__(self, instance, owner=None):
+        """
+        Bind the adapter like the decorated function would be bound.
+
+        :param instance: The instance the adapter is accessed through, None when accessed through the class.
+        :param owner: The class the adapter is accessed through.
+        :return: A BoundTaskAdapter for methods and classmethods, the adapter itself otherwise.
+        """
+        if self._binds_class:
+            return BoundTaskAdapter(self, owner if owner is not None else type(instance))
+        if self._binds_instance and instance is not None:
+            return BoundTaskAdapter(self, instance)
+        return self
+
+    def __call__(self, *args, **kwargs) -> Tasqq:
+        """
+        Add a task calling the decorated function.
+
+        :param args: The positional arguments of the function.
+        :param kwargs: The keyword arguments of the function.
+        :return Tasqq: The task object that was added to the queue.
+        """
+        return self.add(self._func, args, kwargs)
+
+    async def qq(self, *args, **kwargs) -> object:
+        """
+        Add a task calling the decorated function and await its result.
+
+        :param args: The positional arguments of the function.
+        :param kwargs: The keyword arguments of the function.
+        :return: The result of the task.
+        """
+        return await self(*args, **kwargs).qq()
+
+    def add(self, func: Callable, args: tuple, kwargs: dict) -> Tasqq:
+        """
+        Add a task calling a function.
+
+        :param func: The function.
+        :param args: The positional arguments of the function.
+        :param kwargs: The keyword arguments of the function.
+        :return Tasqq: The task object that was added to the queue.
+        """
+        if args:
+            func = functools.partial(func, *args)
+        return self._asynqq.add_limited(func, kwargs, self._tasqq_id, self._callback, self._lane, self._rate_limiter)
+
+
+class BoundTaskAdapter:
+    """
+    BoundTaskAdapter is a TaskAdapter bound to an instance or to a class.
+    """
+
+    __slots__ = ('_adapter', '_obj')
+
+    def __init__(self, adapter: TaskAdapter, obj):
+        """
+        Initialize a BoundTaskAdapter.
+
+        :param adapter: The adapter of the decorated function.
+        :param obj: The instance or class passed as first argument.
+        """
+        self._adapter: TaskAdapter = adapter
+        self._obj = obj
+
+    @property
+    def __wrapped__(self) -> Callable:
+        """
+        Get the decorated function, like the TaskAdapter does.
+        """
+        return self._adapter._func
+
+    def __call__(self, *args, **kwargs) -> Tasqq:
+        """
+        Add a task calling the decorated function bound to the instance or class.
+
+        :param args: The positional arguments of the function.
+        :param kwargs: The keyword arguments of the function.
+        :return Tasqq: The task object that was added to the queue.
+        """
+        return self._adapter.add(self._adapter._func, (self._obj, *args), kwargs)
+
+    async def qq(self, *args, **kwargs) -> object:
+        """
+        Add a task calling the decorated function bound to the instance or class and await its result.
+
+        :param args: The positional arguments of the function.
+        :param kwargs: The keyword arguments of the function.
+        :return: The result of the task.
+        """
+        return await self(*args, **kwargs).qq()
@@ -4,6 +4,7 @@ from logging import Logger
 
 from asynqq.event.event import Event, EventType
 from asynqq.event.subject import Subject
+from asynqq.models.shared_result import SharedResult
 from asynqq.utils.logger import get_logger
 
 
@@ -27,6 +28,8 @@ class Tasqq(Subject, ABC):
         self.result: object = []
         self.created_at: datetime = datetime.datetime.now(datetime.timezone.utc)
         self.completed: bool = False
+        self.rate_limiters: list = []
+        self.rate_booked: list = []
         self._logger: Logger = get_logger(__name__)
 
     def __eq__(self, o: object) -> bool:
@@ -121,15 +124,27 @@ class Tasqq(Subject, ABC):
         """
         Push a result to the task and notify the event.
 
-        :param result: The result to push.
+        :param result: The result to push, large payloads can be pushed as a SharedResult handle.
         :param is_error: Whether the result is an error.
         """
         self.result = result
-        self.event_notify(
-            Event(
-                self.idx,
-                EventType.ERROR if is_error else EventType.RESULT,
-                self.result,
-                **self.kwargs
-            )
-        )
+        self.event_notify(self._event(EventType.ERROR if is_error else EventType.RESULT, self.result))
+
+    def result_view(self) -> object:
+        """
+        Get the result of the task, as a zero-copy view when it is a SharedResult.
+
+        :return: The result of the task.
+        """
+        return self.result.view() if isinstance(self.result, SharedResult) else self.result
+
+    def _event(self, e_type: EventType, data) -> Event:
+        """
+        Build an event of the task.
+        The data is passed by reference, a SharedResult is not copied nor pickled.
+
+        :param e_type: The type of the event.
+        :param data: The data associated with the event.
+        :return: The event.
+        """
+        return Event(self.idx, e_type, data, params=self.kwargs.get('params', {}))
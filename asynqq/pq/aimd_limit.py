@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Callable
+
+
+class AimdLimit:
+    """
+    AimdLimit is an additive-increase/multiplicative-decrease concurrency limit.
+    It is fed with the run time and outcome of each task: the limit grows by one on a fast success
+    while the running tasks use at least half of it, and is multiplied by the backoff ratio on an error
+    or on a slow task.
+    A task is slow when it runs longer than the timeout or, without a timeout, longer than the tolerance
+    times the moving average of the run times.
+    """
+
+    def __init__(self, min_limit: int = 1, max_limit: int = 64, initial_limit: int = None,
+                 backoff_ratio: float = 0.9, timeout: float = None, tolerance: float = 2.0, smoothing: float = 0.1):
+        """
+        Initialize an AimdLimit.
+
+        :param min_limit: The lower bound of the limit. Defaults to 1.
+        :param max_limit: The upper bound of the limit. Defaults to 64.
+        :param initial_limit: The starting limit. Defaults to min_limit.
+        :param backoff_ratio: The factor applied to the limit on an error or a slow task. Defaults to 0.9.
+        :param timeout: The run time in seconds above which a task is slow. Defaults to None.
+        :param tolerance: The ratio to the average run time above which a task is slow,
+            used when timeout is None. Defaults to 2.0.
+        :param smoothing: The weight of a new run time in the moving average. Defaults to 0.1.
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f'invalid limit bounds [{min_limit}, {max_limit}]')
+        if not 0 < backoff_ratio < 1:
+            raise ValueError(f'backoff_ratio must be in (0, 1), got {backoff_ratio}')
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit
+        self.backoff_ratio: float = backoff_ratio
+        self.timeout: float = timeout
+        self.tolerance: float = tolerance
+        self.smoothing: float = smoothing
+        self._limit: float = float(min(max(initial_limit or min_limit, min_limit), max_limit))
+        self._average: float = 0.0
+        self._started: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """
+        Get the current limit.
+
+        :return: The current limit.
+        """
+        return int(self._limit)
+
+    def on_start(self, idx: str) -> None:
+        """
+        Record the start of a task.
+
+        :param idx: The identifier of the task.
+        """
+        with self._lock:
+            self._started[idx] = time.monotonic()
+
+    def on_cancel(self, idx: str) -> None:
+        """
+        Forget a task that was stopped before completing.
+
+        :param idx: The identifier of the task.
+        """
+        with self._lock:
+            self._started.pop(idx, None)
+
+    def on_sample(self, idx: str, is_error: bool, inflight: int,
+                  on_change: Callable[[int, int], None] = None) -> int:
+        """
+        Update the limit with the outcome of a task.
+
+        :param idx: The identifier of the task.
+        :param is_error: Whether the task failed.
+        :param inflight: The number of running tasks.
+        :param on_change: Called with the previous and the new limit when the limit changes, while holding
+            the lock, so concurrent changes are applied in order. Defaults to None.
+        :return: The updated limit.
+        """
+        with self._lock:
+            started = self._started.pop(idx, None)
+            if started is None:
+                return self.limit
+            previous = self.limit
+            elapsed = time.monotonic() - started
+            if is_error or self._is_slow(elapsed):
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+            elif inflight * 2 >= self._limit:
+                self._limit = min(self.max_limit, self._limit + 1)
+            if not is_error:
+                self._average = elapsed if not self._average else \
+                    (1 - self.smoothing) * self._average + self.smoothing * elapsed
+            if on_change is not None and self.limit != previous:
+                on_change(previous, self.limit)
+            return self.limit
+
+    def _is_slow(self, elapsed: float) -> bool:
+        """
+        Check if a run time is above the slow threshold.
+
+        :param elapsed: The run time in seconds.
+        :return: True if the task is slow, False otherwise.
+        """
+        if self.timeout is not None:
+            return elapsed > self.timeout
+        return self._average > 0 and elapsed > self.tolerance * self._average
@@ -0,0 +1,380 @@
+import asyncio
+import importlib
+import io
+import itertools
+import multiprocessing
+import pickle
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from multiprocessing.connection import Connection, wait
+from threading import Thread
+
+from asynqq.utils.logger import get_logger
+
+# Set in worker processes, where importing a module that creates a cluster must not start it
+_in_worker = False
+
+
+def _lookup(module, qualname: str):
+    """
+    Get an attribute of a module by its qualified name.
+
+    :param module: The module.
+    :param qualname: The qualified name of the attribute.
+    :return: The attribute, or None if it is not found.
+    """
+    target = module
+    for name in qualname.split('.'):
+        target = getattr(target, name, None)
+        if target is None:
+            return None
+    return target
+
+
+def _resolve_function(module_name: str, qualname: str):
+    """
+    Get the function wrapped by the decorator found at a qualified name, when unpickling a task in a worker.
+
+    :param module_name: The name of the module of the function.
+    :param qualname: The qualified name of the function.
+    :return: The wrapped function.
+    """
+    return _lookup(importlib.import_module(module_name), qualname).__wrapped__
+
+
+class _TaskPickler(pickle.Pickler):
+    """
+    _TaskPickler pickles the tasks sent to the workers.
+    A function decorated with Asynqq.task is not reachable by its name, which holds the decorator,
+    so it is pickled as a reference to the decorator and unwrapped in the worker.
+    """
+
+    def reducer_override(self, obj):
+        """
+        Reduce the functions wrapped by the decorator found at their qualified name.
+
+        :param obj: The object to pickle.
+        :return: The reduction, or NotImplemented to pickle the object as usual.
+        """
+        if isinstance(obj, types.FunctionType):
+            module = sys.modules.get(obj.__module__)
+            target = _lookup(module, obj.__qualname__) if module is not None else None
+            if target is not obj and getattr(target, '__wrapped__', None) is obj:
+                return _resolve_function, (obj.__module__, obj.__qualname__)
+        return NotImplemented
+
+
+def _dumps(obj) -> bytes:
+    """
+    Pickle a task for the workers.
+
+    :param obj: The task.
+    :return: The pickled task.
+    """
+    buffer = io.BytesIO()
+    _TaskPickler(buffer).dump(obj)
+    return buffer.getvalue()
+
+
+def _worker_main(tasks, results: Connection, heartbeat_interval: float) -> None:
+    """
+    Run a cluster worker process: execute the tasks received on the tasks queue one at a time
+    and send the results back, while a background thread sends heartbeats.
+
+    :param tasks: The queue the worker receives pickled tasks from, None stops the worker.
+    :param results: The pipe the worker sends heartbeats and pickled results to.
+    :param heartbeat_interval: The time in seconds between heartbeats.
+    """
+    global _in_worker
+    _in_worker = True
+    stopped = threading.Event()
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            results.send(message)
+
+    def heartbeat():
+        while True:
+            try:
+                send(('heartbeat', None, None))
+            except OSError:
+                return
+            if stopped.wait(heartbeat_interval):
+                return
+
+    Thread(target=heartbeat, daemon=True).start()
+    while True:
+        item = tasks.get()
+        if item is None:
+            break
+        ticket, payload = item
+        try:
+            func, kwargs = pickle.loads(payload)
+            result = func(**kwargs)
+            if asyncio.iscoroutine(result):
+                result = asyncio.run(result)
+            outcome = (False, pickle.dumps(result))
+        except Exception as ex:
+            outcome = (True, str(ex))
+        send(('result', ticket, outcome))
+    stopped.set()
+
+
+class WorkerSlot:
+    """
+    WorkerSlot holds the state of a cluster worker: its process, its tasks queue, its results pipe,
+    the tickets of the tasks sent to it and the time of its last heartbeat.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty WorkerSlot, the process is started by Clusterqq.
+        """
+        self.process = None
+        self.tasks = None
+        self.results = None
+        self.inflight: set[int] = set()
+        self.last_seen: float = 0.0
+
+
+class Clusterqq:
+    """
+    Clusterqq class runs tasks on a pool of local worker processes.
+    Tasks are pickled by reference, as importable or Asynqq.task decorated functions plus their kwargs,
+    and sent to the least loaded worker over its own queue. Each worker sends results and heartbeats back
+    over its own pipe, so a worker killed while sending can only break its own channel.
+    A monitor thread restarts the workers that died or stopped sending heartbeats, and fails their tasks.
+    """
+
+    def __init__(self, workers: int = None, heartbeat_interval: float = 1.0, heartbeat_timeout: float = 10.0,
+                 start_method: str = 'spawn'):
+        """
+        Initialize Clusterqq with
+        a logger,
+        a multiprocessing context,
+        a slot for each worker,
+        a dictionary of pending tasks by ticket,
+        a list of retired pipes to close,
+        a lock guarding the slots, the pending tasks and the retired pipes and
+        a thread completing the tasks, so slow callbacks never hold up the heartbeats.
+
+        :param workers: The number of worker processes. Defaults to the number of CPUs.
+        :param heartbeat_interval: The time in seconds between worker heartbeats. Defaults to 1.0.
+        :param heartbeat_timeout: The time in seconds without heartbeats after which a worker is restarted.
+            Defaults to 10.0.
+        :param start_method: The multiprocessing start method. Defaults to 'spawn'.
+        """
+        self._logger: Logger = get_logger(__name__)
+        self._ctx = multiprocessing.get_context(start_method)
+        self._heartbeat_interval: float = heartbeat_interval
+        self._heartbeat_timeout: float = heartbeat_timeout
+        self._slots: list[WorkerSlot] = [WorkerSlot() for _ in range(workers or self._ctx.cpu_count())]
+        self._pending: dict[int, object] = {}
+        self._retired: list[Connection] = []
+        self._tickets = itertools.count()
+        self._lock = threading.Lock()
+        self._started: bool = False
+        self._stop = threading.Event()
+        self._closed = threading.Event()
+        self._reader = Thread(target=self._read_results, name='clusterqq-reader', daemon=True)
+        self._completer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='clusterqq-completer')
+        self._monitor = Thread(target=self._monitor_workers, name='clusterqq-monitor', daemon=True)
+
+    @property
+    def workers(self) -> int:
+        """
+        Get the number of worker processes.
+        """
+        return len(self._slots)
+
+    def start(self):
+        """
+        Start the worker processes, the results reader and the monitor.
+        Does nothing in a worker process, which imports the modules of its tasks.
+        """
+        if _in_worker:
+            return
+        with self._lock:
+            for worker in self._slots:
+                self._spawn(worker)
+        self._reader.start()
+        self._monitor.start()
+        self._started = True
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the workers once they have run their queued tasks, terminating them after a timeout,
+        and fail the tasks left pending.
+
+        :param timeout: The time in seconds to wait for each worker. Defaults to 5.0.
+        """
+        if not self._started:
+            return
+        self._stop.set()
+        self._monitor.join()
+        for worker in self._slots:
+            worker.tasks.put(None)
+        for worker in self._slots:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        # The reader drains the results sent before the workers exited
+        self._closed.set()
+        self._reader.join()
+        self._completer.shutdown(wait=True)
+        with self._lock:
+            for worker in self._slots:
+                if worker.results is not None:
+                    worker.results.close()
+                    worker.results = None
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for tqq in pending:
+            tqq.complete('Cluster stopped', True)
+
+    def submit(self, tqq) -> int:
+        """
+        Send a task to the least loaded worker.
+
+        :param tqq: The task, with func and kwargs attributes and a complete(result, is_error) method.
+        :return: The ticket of the task in the cluster.
+        """
+        if not self._started:
+            raise RuntimeError('Clusterqq is not started')
+        # Pickle here, so unpicklable tasks fail on submit instead of in the queue feeder thread
+        payload = _dumps((tqq.func, tqq.kwargs))
+        ticket = next(self._tickets)
+        with self._lock:
+            worker = min(self._slots, key=lambda w: len(w.inflight))
+            self._pending[ticket] = tqq
+            worker.inflight.add(ticket)
+            worker.tasks.put((ticket, payload))
+        return ticket
+
+    def cancel(self, ticket: int) -> None:
+        """
+        Forget a task, its result is discarded when it arrives.
+
+        :param ticket: The ticket of the task.
+        """
+        with self._lock:
+            self._pending.pop(ticket, None)
+
+    def get_working_size(self):
+        """
+        Get the number of tasks sent to the workers and not completed.
+        """
+        with self._lock:
+            return len(self._pending)
+
+    def _spawn(self, worker: WorkerSlot) -> None:
+        """
+        Start the process of a worker with a new tasks queue and results pipe. Must be called while holding the lock.
+
+        :param worker: The worker slot.
+        """
+        slot = self._slots.index(worker)
+        worker.tasks = self._ctx.Queue()
+        worker.results, child_results = self._ctx.Pipe(duplex=False)
+        worker.last_seen = time.monotonic()
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker.tasks, child_results, self._heartbeat_interval),
+            name=f'clusterqq-worker-{slot}',
+            daemon=True
+        )
+        worker.process.start()
+        # Only the worker keeps the sending end, so the pipe reports EOF when it exits
+        child_results.close()
+
+    def _read_results(self) -> None:
+        """
+        Read the heartbeats and the results sent by the workers and complete the tasks.
+        Once the cluster is closed, keep reading until no pipe has data left.
+        """
+        while True:
+            closing = self._closed.is_set()
+            with self._lock:
+                for conn in self._retired:
+                    conn.close()
+                self._retired.clear()
+                conns = {w.results: w for w in self._slots if w.results is not None}
+            ready = wait(list(conns), timeout=0 if closing else self._heartbeat_interval)
+            for conn in ready:
+                self._read_result(conn, conns[conn])
+            if closing and not ready:
+                return
+
+    def _read_result(self, conn: Connection, worker: WorkerSlot) -> None:
+        """
+        Read a message from the pipe of a worker, retiring the pipe if the worker is gone.
+
+        :param conn: The results pipe.
+        :param worker: The worker slot the pipe was read for.
+        """
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            message = None
+        with self._lock:
+            # A restarted worker has a new pipe, the old one is already retired
+            if worker.results is not conn:
+                return
+            if message is None:
+                worker.results = None
+                self._retired.append(conn)
+                return
+            kind, ticket, outcome = message
+            worker.last_seen = time.monotonic()
+            if kind != 'result':
+                return
+            worker.inflight.discard(ticket)
+            tqq = self._pending.pop(ticket, None)
+        if tqq is not None:
+            self._completer.submit(self._complete, tqq, *outcome)
+
+    @staticmethod
+    def _complete(tqq, is_error: bool, data) -> None:
+        """
+        Complete a task with the outcome sent by its worker, on the completer thread.
+
+        :param tqq: The task.
+        :param is_error: Whether the task failed.
+        :param data: The error message, or the pickled result.
+        """
+        if not is_error:
+            try:
+                data = pickle.loads(data)
+            except Exception as ex:
+                is_error, data = True, f'Error on result unpickling: {ex}'
+        tqq.complete(data, is_error)
+
+    def _monitor_workers(self) -> None:
+        """
+        Restart the workers that died or missed their heartbeats, and fail the tasks they were running.
+        """
+        while not self._stop.wait(self._heartbeat_interval):
+            failed = []
+            with self._lock:
+                now = time.monotonic()
+                for slot, worker in enumerate(self._slots):
+                    alive = worker.process.is_alive()
+                    if alive and now - worker.last_seen <= self._heartbeat_timeout:
+                        continue
+                    self._logger.warning("Restarting cluster worker %s, %s", slot,
+                                         'missed heartbeats' if alive else f"exit code {worker.process.exitcode}")
+                    if alive:
+                        worker.process.kill()
+                    worker.tasks.cancel_join_thread()
+                    if worker.results is not None:
+                        self._retired.append(worker.results)
+                    failed.extend(self._pending.pop(t) for t in worker.inflight if t in self._pending)
+                    worker.inflight.clear()
+                    self._spawn(worker)
+            for tqq in failed:
+                self._completer.submit(tqq.complete, 'Cluster worker died', True)
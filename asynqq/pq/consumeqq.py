@@ -1,12 +1,16 @@
 import threading
 import time
 from logging import Logger
+from queue import Empty
 from threading import Thread
+from typing import Optional
 
 from asynqq.event.event import Event, EventType
 from asynqq.event.observer import Observer
 from asynqq.models.tasqq import Tasqq
 from asynqq.pq.check_queue import CheckQueue
+from asynqq.pq.delay_queue import DelayQueue
+from asynqq.pq.rate_limiter import RateLimiter
 from asynqq.utils.logger import get_logger
 
 
@@ -20,18 +24,22 @@ class Consumeqq(Thread, Observer):
         Initialize Consumeqq with
         a logger,
         a queue,
+        a queue of tasks held back by their rate limiters,
         a maximum number of workers,
         a stop flag,
-        a dictionary of tasks and
-        a queue lock.
+        a dictionary of tasks,
+        a queue lock and
+        a tasks lock.
         """
         super(Consumeqq, self).__init__(daemon=True)
         self._logger: Logger = get_logger(__name__)
         self._queue: CheckQueue[Tasqq] = CheckQueue()
+        self._delayed: DelayQueue = DelayQueue()
         self._max_workers: int = max_workers
-        self._stop: bool = False
+        self._stopped: bool = False
         self._tasks: dict[str, Tasqq] = {}
         self._queue_lock = threading.Lock()
+        self._tasks_lock = threading.Lock()
 
     def get_queue(self):
         """
@@ -44,18 +52,27 @@ class Consumeqq(Thread, Observer):
         Clear the queue.
         """
         self._queue.queue.clear()
+        for tqq in self._delayed.clear():
+            RateLimiter.release(tqq.rate_booked)
 
     def get_queue_size(self):
         """
         Get the size of the queue.
         """
-        return self._queue.qsize()
+        return self._queue.qsize() + len(self._delayed)
 
     def get_working_size(self):
         """
         Get the size of the working tasks.
         """
-        return len(self._tasks)
+        with self._tasks_lock:
+            return len(self._tasks)
+
+    def set_max_workers(self, max_workers: int):
+        """
+        Set the maximum number of working tasks, running tasks above the new limit are not stopped.
+        """
+        self._max_workers = max_workers
 
     def add(self, task: Tasqq):
         """
@@ -69,44 +86,74 @@ class Consumeqq(Thread, Observer):
         Remove a task from the queue.
         """
         with self._queue_lock:
-            if idx in self._tasks:
-                tqq = self._tasks.pop(idx)
+            with self._tasks_lock:
+                tqq = self._tasks.pop(idx, None)
+            if tqq is not None:
                 tqq.stop()
             elif idx in self._queue:
                 self._queue.remove(idx)
+            else:
+                tqq = self._delayed.remove(idx)
+                if tqq is not None:
+                    RateLimiter.release(tqq.rate_booked)
 
     def run(self):
         """
         Run the consumer thread.
         """
         self._logger.debug("Starting Asynqq consumer")
-        while not self._stop:
+        while not self._stopped:
             if 0 < self._max_workers <= self.get_working_size():
                 time.sleep(0.2)
                 continue
-            tqq: Tasqq = self._queue.get()
+            tqq = self._delayed.get_due()
             if tqq is None:
+                tqq = self._next_task()
+                if tqq is None:
+                    continue
+            wait = RateLimiter.acquire(tqq.rate_limiters, tqq.rate_booked)
+            if wait > 0:
+                # Hold the task back until its start time, without taking a worker
+                self._delayed.put(tqq, wait)
                 continue
             try:
                 tqq.attach(self)
+                # Track the task before starting it, a fast task may complete before start() returns
+                with self._tasks_lock:
+                    self._tasks[tqq.idx] = tqq
                 tqq.start()
-                self._tasks[tqq.idx] = tqq
             except Exception as ex:
+                with self._tasks_lock:
+                    self._tasks.pop(tqq.idx, None)
                 tqq.add_error(str(ex))
                 tqq.event_notify(Event(tqq.idx, EventType.ERROR, f'Error on tasqq start: {ex}'))
         self._logger.debug("Asynqq consumer stopped")
         self._queue.task_done()
 
+    def _next_task(self) -> Optional[Tasqq]:
+        """
+        Get the next task from the queue, waiting at most until the next held back task is due.
+
+        :return: The next task, or None if no task is available.
+        """
+        try:
+            return self._queue.get(timeout=self._delayed.next_due_in())
+        except Empty:
+            return None
+
     def stop(self):
         """
         Stop the consumer thread.
         """
-        self._stop = True
+        self._stopped = True
+        # Wake up the consumer if it is blocked waiting for a task
+        self._queue.put(None)
         self.join()
 
     def event_update(self, subject, event: Event) -> None:
         """
         Update the event and remove the task from the tasks dictionary if the event type is RESULT or ERROR.
         """
-        if event.e_type in [EventType.RESULT, EventType.ERROR] and event.idx in self._tasks:
-            self._tasks.pop(event.idx)
+        if event.e_type in [EventType.RESULT, EventType.ERROR]:
+            with self._tasks_lock:
+                self._tasks.pop(event.idx, None)
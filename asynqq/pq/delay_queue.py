@@ -0,0 +1,104 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Optional
+
+
+class DelayQueue:
+    """
+    DelayQueue is a thread-safe queue of items that become available after a delay.
+    Items with the same due time are returned in insertion order.
+    """
+
+    def __init__(self):
+        """
+        Initialize DelayQueue with a heap, a sequence counter and a lock.
+        """
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """
+        Get the number of delayed items.
+        """
+        return len(self._heap)
+
+    def __contains__(self, item) -> bool:
+        """
+        Check if an item is in the queue.
+
+        Parameters:
+        :param item: The item to check for in the queue.
+
+        Returns:
+        :return bool: True if the item is in the queue, False otherwise.
+        """
+        with self._lock:
+            return any(i == item for _, _, i in self._heap)
+
+    def put(self, item, delay: float) -> None:
+        """
+        Add an item that becomes available after a delay.
+
+        Parameters:
+        :param item: The item to add.
+        :param delay: The number of seconds before the item is available.
+        """
+        with self._lock:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), item))
+
+    def get_due(self) -> Optional[object]:
+        """
+        Pop the next item whose delay has elapsed.
+
+        Returns:
+        :return: The item, or None if no item is due.
+        """
+        with self._lock:
+            if self._heap and self._heap[0][0] <= time.monotonic():
+                return heapq.heappop(self._heap)[2]
+            return None
+
+    def next_due_in(self) -> Optional[float]:
+        """
+        Get the time until the next item is due.
+
+        Returns:
+        :return: The number of seconds until the next item is due, or None if the queue is empty.
+        """
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def remove(self, item) -> Optional[object]:
+        """
+        Remove a specific item from the queue.
+
+        Parameters:
+        :param item: The item to remove from the queue.
+
+        Returns:
+        :return: The removed item, or None if it was not in the queue.
+        """
+        with self._lock:
+            for i, entry in enumerate(self._heap):
+                if entry[2] == item:
+                    self._heap.pop(i)
+                    heapq.heapify(self._heap)
+                    return entry[2]
+            return None
+
+    def clear(self) -> list:
+        """
+        Remove all the items from the queue.
+
+        Returns:
+        :return list: The removed items.
+        """
+        with self._lock:
+            items = [entry[2] for entry in self._heap]
+            self._heap.clear()
+            return items
@@ -0,0 +1,228 @@
+import itertools
+import os
+import threading
+from collections import deque
+from logging import Logger
+from threading import Thread
+from typing import Optional
+
+from asynqq.event.event import Event, EventType
+from asynqq.event.observer import Observer
+from asynqq.models.tasqq import Tasqq
+from asynqq.pq.delay_queue import DelayQueue
+from asynqq.pq.rate_limiter import RateLimiter
+from asynqq.utils.logger import get_logger
+
+
+class Dispatchqq(Observer):
+    """
+    Dispatchqq class is a sharded consumer that manages tasks with several dispatcher threads.
+    Each dispatcher owns a local deque of tasks and steals from the other deques when its own is empty.
+    It exposes the same interface as Consumeqq.
+    Under the GIL, dispatchers do not start trivial tasks faster than a single consumer, as the work to start
+    a task is Python code that runs on one core at a time. They help when starting a task blocks, e.g. on
+    START callbacks doing I/O, as the other dispatchers keep starting tasks meanwhile.
+    """
+
+    def __init__(self, max_workers=0, dispatchers=None):
+        """
+        Initialize Dispatchqq with
+        a logger,
+        a local deque and lock for each dispatcher,
+        a shared queue of tasks held back by their rate limiters,
+        a maximum number of workers,
+        a stop flag,
+        a dictionary of running tasks by identity, as tasks may share an idx, guarded by a condition and
+        a wake-up semaphore for idle dispatchers.
+
+        :param max_workers: The maximum number of running tasks, 0 means unbounded. Defaults to 0.
+        :param dispatchers: The number of dispatcher threads. Defaults to the number of CPUs.
+        """
+        self._logger: Logger = get_logger(__name__)
+        self._dispatchers: int = max(1, dispatchers or os.cpu_count() or 1)
+        self._shards: list[deque[Tasqq]] = [deque() for _ in range(self._dispatchers)]
+        self._shard_locks: list[threading.Lock] = [threading.Lock() for _ in range(self._dispatchers)]
+        self._next_shard = itertools.count()
+        self._delayed: DelayQueue = DelayQueue()
+        self._max_workers: int = max_workers
+        self._stop = threading.Event()
+        self._tasks: dict[int, Tasqq] = {}
+        self._busy: int = 0
+        self._tasks_cond = threading.Condition()
+        self._wakeup = threading.Semaphore(0)
+        self._threads: list[Thread] = [
+            Thread(target=self._dispatch, args=(i,), name=f'dispatchqq-{i}', daemon=True)
+            for i in range(self._dispatchers)
+        ]
+
+    def start(self):
+        """
+        Start the dispatcher threads.
+        """
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """
+        Stop the dispatcher threads.
+        """
+        self._stop.set()
+        self._wakeup.release(self._dispatchers)
+        with self._tasks_cond:
+            self._tasks_cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def clear_queue(self):
+        """
+        Clear the queue.
+        """
+        for shard, lock in zip(self._shards, self._shard_locks):
+            with lock:
+                shard.clear()
+        for tqq in self._delayed.clear():
+            RateLimiter.release(tqq.rate_booked)
+
+    def get_queue_size(self):
+        """
+        Get the size of the queue.
+        """
+        return sum(len(shard) for shard in self._shards) + len(self._delayed)
+
+    def get_working_size(self):
+        """
+        Get the size of the working tasks.
+        """
+        with self._tasks_cond:
+            return len(self._tasks)
+
+    def set_max_workers(self, max_workers: int):
+        """
+        Set the maximum number of working tasks, running tasks above the new limit are not stopped.
+        """
+        with self._tasks_cond:
+            self._max_workers = max_workers
+            self._tasks_cond.notify_all()
+
+    def add(self, task: Tasqq):
+        """
+        Add a task to the local deque of the next dispatcher, round-robin.
+        """
+        i = next(self._next_shard) % self._dispatchers
+        with self._shard_locks[i]:
+            self._shards[i].append(task)
+        self._wakeup.release()
+
+    def remove(self, idx):
+        """
+        Remove a task from the queue, or stop it if it is running.
+        """
+        with self._tasks_cond:
+            key = next((key for key, tqq in self._tasks.items() if tqq.idx == idx), None)
+            tqq = self._tasks.pop(key, None)
+            if tqq is not None:
+                self._release_slot()
+        if tqq is not None:
+            tqq.stop()
+            return
+        for shard, lock in zip(self._shards, self._shard_locks):
+            with lock:
+                for i in shard:
+                    if i == idx:
+                        shard.remove(i)
+                        return
+        tqq = self._delayed.remove(idx)
+        if tqq is not None:
+            RateLimiter.release(tqq.rate_booked)
+
+    def event_update(self, subject, event: Event) -> None:
+        """
+        Update the event and remove the task from the tasks dictionary if the event type is RESULT or ERROR.
+        """
+        if event.e_type in [EventType.RESULT, EventType.ERROR]:
+            with self._tasks_cond:
+                if self._tasks.pop(id(subject), None) is not None:
+                    self._release_slot()
+
+    def _dispatch(self, shard: int):
+        """
+        Run a dispatcher thread: reserve a worker slot, take a held back task that is due or a queued task,
+        and start it.
+
+        :param shard: The index of the local deque owned by this dispatcher.
+        """
+        self._logger.debug("Starting Asynqq dispatcher %s", shard)
+        while not self._stop.is_set():
+            if not self._reserve_slot(timeout=0.2):
+                continue
+            # Skip the lock of the delay queue while no task is held back
+            tqq = self._delayed.get_due() if self._delayed else None
+            if tqq is None:
+                tqq = self._take(shard)
+                if tqq is None:
+                    with self._tasks_cond:
+                        self._release_slot()
+                    next_due = self._delayed.next_due_in()
+                    self._wakeup.acquire(timeout=0.2 if next_due is None else min(0.2, next_due))
+                    continue
+            wait = RateLimiter.acquire(tqq.rate_limiters, tqq.rate_booked)
+            if wait > 0:
+                # Hold the task back until its start time, without taking a worker
+                self._delayed.put(tqq, wait)
+                with self._tasks_cond:
+                    self._release_slot()
+                continue
+            try:
+                tqq.attach(self)
+                # Track the task before starting it, a fast task may complete before start() returns
+                with self._tasks_cond:
+                    self._tasks[id(tqq)] = tqq
+                tqq.start()
+            except Exception as ex:
+                with self._tasks_cond:
+                    if self._tasks.pop(id(tqq), None) is not None:
+                        self._release_slot()
+                tqq.add_error(str(ex))
+                tqq.event_notify(Event(tqq.idx, EventType.ERROR, f'Error on tasqq start: {ex}'))
+        self._logger.debug("Asynqq dispatcher %s stopped", shard)
+
+    def _take(self, shard: int) -> Optional[Tasqq]:
+        """
+        Take the oldest task from the local deque, or steal the newest task from another deque.
+
+        :param shard: The index of the local deque owned by the caller.
+        :return: The task to start, or None if every deque is empty.
+        """
+        with self._shard_locks[shard]:
+            if self._shards[shard]:
+                return self._shards[shard].popleft()
+        for offset in range(1, self._dispatchers):
+            victim = (shard + offset) % self._dispatchers
+            if not self._shards[victim]:
+                continue
+            with self._shard_locks[victim]:
+                if self._shards[victim]:
+                    return self._shards[victim].pop()
+        return None
+
+    def _reserve_slot(self, timeout: float) -> bool:
+        """
+        Reserve a worker slot, waiting up to timeout seconds while max_workers tasks are running.
+
+        :param timeout: The maximum time to wait for a free slot.
+        :return: True if a slot was reserved, False otherwise.
+        """
+        with self._tasks_cond:
+            if 0 < self._max_workers <= self._busy:
+                self._tasks_cond.wait(timeout)
+                if self._stop.is_set() or 0 < self._max_workers <= self._busy:
+                    return False
+            self._busy += 1
+            return True
+
+    def _release_slot(self):
+        """
+        Release a worker slot. Must be called while holding the tasks condition.
+        """
+        self._busy -= 1
+        self._tasks_cond.notify()
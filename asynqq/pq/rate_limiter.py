@@ -0,0 +1,128 @@
+import bisect
+import threading
+import time
+from typing import Optional, Union
+
+# Serializes bookings on limiters shared between consumer threads
+_acquire_lock = threading.Lock()
+
+
+class RateLimiter:
+    """
+    RateLimiter is a token bucket that grants `rate` tokens per second, with bursts of up to `burst` tokens.
+    It is implemented as a GCRA: a token is booked for a start time, which pushes back the theoretical
+    arrival time of the next token. A refunded token that is not the latest one leaves a free slot,
+    which is booked again before any later token, so the tasks booked around it keep their spacing.
+    Consumers book the limiters of a task before starting it and hold the task back until its start time,
+    so workers are never blocked sleeping on a rate limit.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize a RateLimiter with a full bucket.
+
+        :param rate: The number of tokens granted per second.
+        :param burst: The maximum number of tokens the bucket can hold. Defaults to 1.
+        """
+        if rate <= 0:
+            raise ValueError(f'rate must be positive, got {rate}')
+        if burst < 1:
+            raise ValueError(f'burst must be at least 1, got {burst}')
+        self.rate: float = float(rate)
+        self.burst: int = burst
+        self._interval: float = 1 / self.rate
+        self._tolerance: float = (burst - 1) * self._interval
+        self._tat: float = time.monotonic()
+        self._freed: list[float] = []
+
+    @classmethod
+    def of(cls, value: Union['RateLimiter', float, None]) -> Optional['RateLimiter']:
+        """
+        Build a RateLimiter from a value.
+
+        :param value: A RateLimiter, a number of calls per second or None.
+        :return: The RateLimiter, or None if value is None.
+        """
+        if value is None or isinstance(value, RateLimiter):
+            return value
+        return cls(rate=value)
+
+    def earliest(self, now: float) -> float:
+        """
+        Get the earliest time a token can be booked for, dropping the free slots whose time has passed.
+
+        :param now: The current monotonic time.
+        :return: The earliest monotonic time, not before now.
+        """
+        stale = bisect.bisect_left(self._freed, now + self._tolerance)
+        del self._freed[:stale]
+        if self._freed:
+            return self._freed[0] - self._tolerance
+        return max(now, self._tat - self._tolerance)
+
+    def book(self, at: float) -> float:
+        """
+        Book a token for a start time, which must not be before earliest().
+        The first free slot is booked when the start time is its own.
+
+        :param at: The monotonic start time.
+        :return: The slot of the token, to refund it.
+        """
+        if self._freed and at <= self._freed[0] - self._tolerance:
+            return self._freed.pop(0)
+        slot = max(self._tat, at)
+        self._tat = slot + self._interval
+        return slot
+
+    def refund(self, slot: float) -> None:
+        """
+        Give back a token booked for a task that will not start.
+        The latest token moves the theoretical arrival time back, over the free slots before it,
+        any other token leaves a free slot.
+
+        :param slot: The slot returned by book().
+        """
+        if slot + self._interval < self._tat:
+            bisect.insort(self._freed, slot)
+            return
+        self._tat = slot
+        while self._freed and self._freed[-1] + self._interval >= self._tat:
+            self._tat = self._freed.pop()
+
+    @staticmethod
+    def acquire(limiters: list['RateLimiter'], booked: list[tuple['RateLimiter', float]]) -> float:
+        """
+        Book a token from the limiters of a task that are not booked yet.
+        The start time of the task is the latest of the earliest times of its limiters.
+        When it is now, every limiter is booked. Otherwise only the limiters that set the start time are booked
+        for it, the others are booked when the task is due, so a slow limiter never takes tokens ahead of time
+        from the limiters it shares with other tasks.
+
+        :param limiters: The limiters of the task.
+        :param booked: The limiters already booked for the task with their slots, updated in place.
+        :return: The number of seconds to hold the task back, 0 if it can start now.
+        """
+        booked_limiters = [limiter for limiter, _ in booked]
+        pending = [limiter for limiter in dict.fromkeys(limiters) if limiter not in booked_limiters]
+        if not pending:
+            return 0.0
+        with _acquire_lock:
+            now = time.monotonic()
+            earliest = [limiter.earliest(now) for limiter in pending]
+            start = max(earliest)
+            for limiter, at in zip(pending, earliest):
+                if start <= now or at >= start:
+                    booked.append((limiter, limiter.book(start)))
+            return start - now
+
+    @staticmethod
+    def release(booked: list[tuple['RateLimiter', float]]) -> None:
+        """
+        Refund the limiters booked for a task that was removed before starting.
+
+        :param booked: The limiters booked for the task with their slots, emptied in place.
+        """
+        with _acquire_lock:
+            for limiter, slot in booked:
+                limiter.refund(slot)
+        booked.clear()
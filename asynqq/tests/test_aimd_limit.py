@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from asynqq.models.asynqq import Asynqq
+from asynqq.pq.aimd_limit import AimdLimit
+
+
+class TestAimdLimit(unittest.IsolatedAsyncioTestCase):
+
+    def test_aimd_limit_increase_and_backoff(self):
+        limit = AimdLimit(min_limit=2, max_limit=4, backoff_ratio=0.5, timeout=1)
+        for idx in ['1', '2', '3']:
+            limit.on_start(idx)
+            limit.on_sample(idx, is_error=False, inflight=limit.limit)
+        self.assertEqual(limit.limit, 4)
+
+        limit.on_start('4')
+        self.assertEqual(limit.on_sample('4', is_error=True, inflight=1), 2)
+        self.assertEqual(limit.on_sample('unknown', is_error=True, inflight=1), 2)
+
+    def test_aimd_limit_applies_changes_in_order(self):
+        limit = AimdLimit(min_limit=1, max_limit=1000, backoff_ratio=0.5, timeout=10)
+        applied = []
+
+        def sample(start):
+            for i in range(start, start + 200):
+                limit.on_start(str(i))
+                limit.on_sample(str(i), is_error=i % 7 == 0, inflight=1000,
+                                on_change=lambda previous, new: applied.append(new))
+
+        threads = [threading.Thread(target=sample, args=(i * 200,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(applied[-1], limit.limit)
+
+    async def test_asynqq_concurrency_grows_with_load(self):
+        concurrency = AimdLimit(min_limit=1, max_limit=8)
+        asynqq = Asynqq(dispatchers=2, concurrency=concurrency)
+
+        def base_func(value):
+            time.sleep(0.01)
+            return value
+
+        tasks = [asynqq.add(base_func, value=i) for i in range(50)]
+        results = await asyncio.gather(*(t.qq() for t in tasks))
+
+        self.assertEqual(results, list(range(50)))
+        self.assertGreater(concurrency.limit, 1)
+        asynqq.stop()
+
+    async def test_asynqq_concurrency_backs_off_on_errors(self):
+        concurrency = AimdLimit(min_limit=1, max_limit=8, initial_limit=8, backoff_ratio=0.5)
+        asynqq = Asynqq(concurrency=concurrency)
+
+        def failing_func():
+            raise ValueError('downstream unavailable')
+
+        tasks = [asynqq.add(failing_func) for _ in range(4)]
+        await asyncio.gather(*(t.qq() for t in tasks))
+
+        self.assertEqual(concurrency.limit, 1)
+        asynqq.stop()
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+
+from asynqq.event.event import Event, EventType
+from asynqq.event.observer import Observer
+from asynqq.event.subject import Subject
+from asynqq.models.asynqq import Asynqq
+from asynqq.models.shared_result import SharedResult
+from asynqq.pq.clusterqq import Clusterqq
+
+
+def get_pid(value):
+    return value, os.getpid()
+
+
+async def async_double(value):
+    await asyncio.sleep(0)
+    return value * 2
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def crash():
+    os._exit(1)
+
+
+def shared_bytes(size):
+    return SharedResult.create(b'x' * size)
+
+
+decorated_asynqq = Asynqq(cluster=Clusterqq(workers=1))
+
+
+@decorated_asynqq.task()
+def decorated_add(a, b):
+    return a + b, os.getpid()
+
+
+class Multiplier:
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    @decorated_asynqq.task()
+    def multiply(self, value):
+        return value * self.factor
+
+    @decorated_asynqq.task()
+    @classmethod
+    def name(cls, suffix):
+        return cls.__name__ + suffix
+
+
+class SlowCallback(Subject, Observer):
+
+    def __init__(self):
+        super().__init__()
+        self.attach(self)
+
+    def event_update(self, subject, event: Event) -> None:
+        if event.e_type == EventType.RESULT:
+            time.sleep(1.5)
+
+
+def tearDownModule():
+    decorated_asynqq.stop()
+
+
+class TestClusterqq(unittest.IsolatedAsyncioTestCase):
+
+    async def test_clusterqq_runs_tasks_in_workers(self):
+        asynqq = Asynqq(cluster=Clusterqq(workers=2))
+
+        results = await asyncio.gather(*(asynqq.add(get_pid, value=i).qq() for i in range(8)))
+        doubled = await asynqq.add(async_double, value=21).qq()
+
+        self.assertEqual([value for value, _ in results], list(range(8)))
+        self.assertNotIn(os.getpid(), {pid for _, pid in results})
+        self.assertEqual(doubled, 42)
+        asynqq.stop()
+
+    async def test_clusterqq_errors_and_worker_restart(self):
+        asynqq = Asynqq(cluster=Clusterqq(workers=1, heartbeat_interval=0.2))
+
+        failed = asynqq.add(fail, message='boom')
+        await failed.qq()
+        crashed = asynqq.add(crash)
+        await crashed.qq()
+        _, pid = await asynqq.add(get_pid, value=1).qq()
+
+        self.assertEqual(failed.errors, ['boom'])
+        self.assertEqual(crashed.errors, ['Cluster worker died'])
+        self.assertNotEqual(pid, os.getpid())
+        asynqq.stop()
+
+    async def test_clusterqq_slow_callback_does_not_restart_workers(self):
+        asynqq = Asynqq(cluster=Clusterqq(workers=1, heartbeat_interval=0.1, heartbeat_timeout=0.5))
+
+        slow = asynqq.add(get_pid, callback=SlowCallback(), value=1)
+        _, pid = await slow.qq()
+        _, next_pid = await asynqq.add(get_pid, value=2).qq()
+
+        self.assertEqual(slow.errors, [])
+        self.assertEqual(next_pid, pid)
+        asynqq.stop()
+
+    async def test_clusterqq_unpicklable_task_fails(self):
+        asynqq = Asynqq(cluster=Clusterqq(workers=1))
+
+        task = asynqq.add(get_pid, value=threading.Lock())
+        await asyncio.wait_for(task.qq(), timeout=5)
+
+        self.assertTrue(task.is_completed())
+        self.assertEqual(len(task.errors), 1)
+        self.assertTrue(task.errors[0].startswith('Error on tasqq submit'))
+        value, _ = await asynqq.add(get_pid, value=1).qq()
+        self.assertEqual(value, 1)
+        asynqq.stop()
+
+    async def test_clusterqq_shared_result(self):
+        asynqq = Asynqq(cluster=Clusterqq(workers=1))
+
+        task = asynqq.add(shared_bytes, size=1 << 20)
+        view = await task.qq()
+
+        self.assertEqual(len(view), 1 << 20)
+        self.assertEqual(bytes(view[:3]), b'xxx')
+        view.release()
+        task.get_result().unlink()
+        asynqq.stop()
+
+    async def test_clusterqq_decorated_tasks(self):
+        total, pid = await decorated_add.qq(1, b=2)
+        product = await Multiplier(3).multiply.qq(5)
+        name = await Multiplier.name.qq('!')
+
+        self.assertEqual(total, 3)
+        self.assertNotEqual(pid, os.getpid())
+        self.assertEqual(product, 15)
+        self.assertEqual(name, 'Multiplier!')
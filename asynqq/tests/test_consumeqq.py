@@ -0,0 +1,31 @@
+import threading
+import time
+import unittest
+
+from asynqq.models.asynqq import Asynqq
+from asynqq.pq.consumeqq import Consumeqq
+
+
+class TestConsumeqq(unittest.IsolatedAsyncioTestCase):
+
+    def test_consumeqq_stop_on_empty_queue(self):
+        consumer = Consumeqq()
+        consumer.start()
+        time.sleep(0.1)
+
+        stopper = threading.Thread(target=consumer.stop)
+        stopper.start()
+        stopper.join(timeout=2)
+
+        self.assertFalse(stopper.is_alive())
+        self.assertFalse(consumer.is_alive())
+
+    async def test_asynqq_stop_after_tasks(self):
+        asynqq = Asynqq(max_workers=2)
+
+        def base_func(value):
+            return value
+
+        self.assertEqual(await asynqq.add(base_func, value=1).qq(), 1)
+        asynqq.stop()
+        self.assertEqual(asynqq.get_qq_size(), 0)
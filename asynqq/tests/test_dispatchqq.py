@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from asynqq.models.asynqq import Asynqq
+
+
+class TestDispatchqq(unittest.IsolatedAsyncioTestCase):
+
+    async def test_dispatchqq_all_tasks_complete(self):
+        asynqq = Asynqq(max_workers=4, dispatchers=4)
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def base_func(value):
+            with lock:
+                running.append(value)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(value)
+            return value * 2
+
+        tasks = [asynqq.add(base_func, value=i) for i in range(40)]
+        results = await asyncio.gather(*(t.qq() for t in tasks))
+
+        self.assertEqual(results, [i * 2 for i in range(40)])
+        self.assertLessEqual(max(peak), 4)
+        self.assertEqual(asynqq.get_qq_size(), 0)
+        asynqq.stop()
+
+    async def test_dispatchqq_remove_queued_task(self):
+        asynqq = Asynqq(max_workers=1, dispatchers=2)
+        started = threading.Event()
+
+        def base_func(duration):
+            started.set()
+            time.sleep(duration)
+            return duration
+
+        first = asynqq.add(base_func, duration=0.3)
+        started.wait()
+        queued = asynqq.add(base_func, duration=0.1)
+        asynqq.remove(queued.idx)
+
+        self.assertEqual(await first.qq(), 0.3)
+        self.assertEqual(asynqq.get_qq_size(), 0)
+        self.assertFalse(queued.is_completed())
+        asynqq.stop()
+
+    async def test_dispatchqq_tasks_sharing_an_idx_release_their_slots(self):
+        asynqq = Asynqq(max_workers=2, dispatchers=2)
+        barrier = threading.Barrier(2, timeout=2)
+
+        def base_func(value):
+            barrier.wait()
+            return value
+
+        shared = [asynqq.add(base_func, idx='1', value=i) for i in range(2)]
+        self.assertEqual(sorted(await asyncio.gather(*(t.qq() for t in shared))), [0, 1])
+        barrier.reset()
+        tasks = [asynqq.add(base_func, value=i) for i in range(2)]
+
+        self.assertEqual(sorted(await asyncio.gather(*(t.qq() for t in tasks))), [0, 1])
+        self.assertEqual([t.errors for t in tasks], [[], []])
+        asynqq.stop()
@@ -0,0 +1,63 @@
+import logging
+import threading
+import unittest
+from logging.handlers import QueueHandler
+from unittest import mock
+
+from asynqq.models.asynqq import Asynqq
+from asynqq.utils.logger import disable_async_logging, enable_async_logging, get_logger
+
+
+class TestLogger(unittest.IsolatedAsyncioTestCase):
+
+    def test_get_logger_configures_once(self):
+        get_logger(__name__)
+        with mock.patch('logging.basicConfig') as basic_config:
+            get_logger(__name__)
+            get_logger('another')
+        basic_config.assert_not_called()
+
+    def test_async_logging_restores_handlers(self):
+        root = logging.getLogger()
+        handlers = root.handlers[:]
+        listener = enable_async_logging()
+        try:
+            self.assertIs(enable_async_logging(), listener)
+            self.assertEqual(len(root.handlers), 1)
+            self.assertIsInstance(root.handlers[0], QueueHandler)
+        finally:
+            disable_async_logging()
+        self.assertEqual(root.handlers, handlers)
+
+    async def test_asynqq_trace_sampled_tasks(self):
+        asynqq = Asynqq(trace_sample_rate=1.0)
+
+        def base_func(value):
+            return value
+
+        with self.assertLogs('asynqq.models.asynqq', level='INFO') as logs:
+            task = asynqq.add(base_func, idx='traced', value=1)
+            await task.qq()
+
+        traces = [r.getMessage() for r in logs.records if r.getMessage().startswith('Trace task traced')]
+        self.assertEqual([t.split()[3] for t in traces], ['QUEUED', 'START', 'RESULT'])
+        asynqq.stop()
+
+    async def test_asynqq_trace_removed_queued_task(self):
+        asynqq = Asynqq(max_workers=1, trace_sample_rate=1.0)
+        release = threading.Event()
+
+        def base_func(value):
+            release.wait(2)
+            return value
+
+        with self.assertLogs('asynqq.models.asynqq', level='INFO') as logs:
+            running = asynqq.add(base_func, value=1)
+            queued = asynqq.add(base_func, idx='queued', value=2)
+            asynqq.remove(queued.idx)
+            release.set()
+            await running.qq()
+
+        traces = [r.getMessage() for r in logs.records if r.getMessage().startswith('Trace task queued')]
+        self.assertEqual([t.split()[3] for t in traces], ['QUEUED', 'REMOVED'])
+        asynqq.stop()
@@ -0,0 +1,153 @@
+import asyncio
+import time
+import unittest
+
+from asynqq.models.asynqq import Asynqq
+from asynqq.pq.rate_limiter import RateLimiter
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+
+    def test_rate_limiter_acquire(self):
+        limiter = RateLimiter(rate=10, burst=2)
+        booked = []
+        self.assertEqual(RateLimiter.acquire([limiter], booked), 0)
+        self.assertEqual(RateLimiter.acquire([limiter], []), 0)
+        self.assertAlmostEqual(RateLimiter.acquire([limiter], []), 0.1, places=2)
+        self.assertAlmostEqual(RateLimiter.acquire([limiter], []), 0.2, places=2)
+        self.assertEqual(RateLimiter.acquire([limiter], booked), 0)
+
+    def test_rate_limiter_books_only_the_slowest_limiter_ahead(self):
+        shared = RateLimiter(rate=10)
+        slow = RateLimiter(rate=1)
+        RateLimiter.acquire([slow], [])
+        for _ in range(5):
+            booked = []
+            self.assertGreater(RateLimiter.acquire([shared, slow], booked), 0.5)
+            self.assertEqual([limiter for limiter, _ in booked], [slow])
+        self.assertEqual(RateLimiter.acquire([shared], []), 0)
+
+    def test_rate_limiter_release(self):
+        limiter = RateLimiter(rate=10)
+        booked = []
+        for _ in range(20):
+            booked = []
+            RateLimiter.acquire([limiter], booked)
+        RateLimiter.release(booked)
+        self.assertEqual(booked, [])
+        self.assertAlmostEqual(RateLimiter.acquire([limiter], []), 1.9, places=1)
+
+    def test_rate_limiter_release_keeps_spacing(self):
+        limiter = RateLimiter(rate=1)
+        self.assertEqual(RateLimiter.acquire([limiter], []), 0)
+        first, second = [], []
+        self.assertAlmostEqual(RateLimiter.acquire([limiter], first), 1, places=2)
+        self.assertAlmostEqual(RateLimiter.acquire([limiter], second), 2, places=2)
+        RateLimiter.release(first)
+
+        self.assertAlmostEqual(RateLimiter.acquire([limiter], []), 1, places=2)
+        self.assertAlmostEqual(RateLimiter.acquire([limiter], []), 3, places=2)
+        RateLimiter.release(second)
+        self.assertAlmostEqual(RateLimiter.acquire([limiter], []), 2, places=2)
+        self.assertAlmostEqual(RateLimiter.acquire([limiter], []), 4, places=2)
+
+    async def test_asynqq_rate_limit(self):
+        asynqq = Asynqq(max_workers=10, rate_limit=20)
+        started = []
+
+        def base_func(value):
+            started.append(time.monotonic())
+            return value
+
+        tasks = [asynqq.add(base_func, value=i) for i in range(10)]
+        results = await asyncio.gather(*(t.qq() for t in tasks))
+
+        self.assertEqual(sorted(results), list(range(10)))
+        self.assertGreaterEqual(max(started) - min(started), 0.4)
+        asynqq.stop()
+
+    async def test_asynqq_lane_does_not_block_other_tasks(self):
+        asynqq = Asynqq(max_workers=2, dispatchers=2, lane_limits={'slow': 2})
+
+        @asynqq.task(lane='slow')
+        def slow_func(value):
+            return value
+
+        def fast_func(value):
+            return value
+
+        slow = [slow_func.qq(value=i) for i in range(4)]
+        fast = asynqq.add(fast_func, value='fast')
+        started = time.monotonic()
+
+        self.assertEqual(await fast.qq(), 'fast')
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(sorted(await asyncio.gather(*slow)), list(range(4)))
+        asynqq.stop()
+
+    async def test_asynqq_removed_tasks_give_back_tokens(self):
+        asynqq = Asynqq(max_workers=10, rate_limit=10)
+
+        def base_func(value):
+            return value
+
+        tasks = [asynqq.add(base_func, value=i) for i in range(50)]
+        await tasks[0].qq()
+        for task in tasks[1:]:
+            asynqq.remove(task.idx)
+        self.assertEqual(asynqq.get_qq_size(), 0)
+
+        started = time.monotonic()
+        self.assertEqual(await asynqq.add(base_func, value='new').qq(), 'new')
+        self.assertLess(time.monotonic() - started, 1)
+        asynqq.stop()
+
+    async def test_asynqq_slow_lane_does_not_use_instance_tokens_ahead(self):
+        asynqq = Asynqq(max_workers=10, rate_limit=10, lane_limits={'slow': 1})
+
+        def base_func(value):
+            return value
+
+        for i in range(30):
+            asynqq.add_limited(base_func, {'value': i}, lane='slow')
+        await asyncio.sleep(0.2)
+
+        started = time.monotonic()
+        results = await asyncio.gather(*(asynqq.add(base_func, value=i).qq() for i in range(10)))
+
+        self.assertEqual(results, list(range(10)))
+        self.assertLess(time.monotonic() - started, 2)
+        asynqq.stop()
+
+    async def test_asynqq_task_kwargs_named_like_limits(self):
+        asynqq = Asynqq(max_workers=2, lane_limits={'x': 10})
+
+        def base_func(lane, rate_limit):
+            return lane, rate_limit
+
+        @asynqq.task(lane='x')
+        def decorated_func(lane, rate_limit):
+            return lane, rate_limit
+
+        self.assertEqual(await asynqq.add(base_func, lane='x', rate_limit=1).qq(), ('x', 1))
+        self.assertEqual(await decorated_func.qq(lane='y', rate_limit=2), ('y', 2))
+        self.assertEqual(await asynqq.add_limited(base_func, {'lane': 'z', 'rate_limit': 3}, lane='x').qq(),
+                         ('z', 3))
+        asynqq.stop()
+
+    async def test_asynqq_task_rate_limiter_is_shared(self):
+        asynqq = Asynqq(max_workers=10)
+        limiter = RateLimiter(rate=10)
+        started = []
+
+        def base_func(value):
+            started.append(time.monotonic())
+            return value
+
+        tasks = [asynqq.add_limited(base_func, {'value': i}, rate_limiter=limiter) for i in range(6)]
+        await asyncio.gather(*(t.qq() for t in tasks))
+
+        self.assertGreaterEqual(max(started) - min(started), 0.4)
+        with self.assertRaises(TypeError):
+            asynqq.add_limited(base_func, {'value': 0}, rate_limiter=10)
+        asynqq.stop()
@@ -0,0 +1,58 @@
+import pickle
+import unittest
+
+from asynqq.models.asynqq import Asynqq
+from asynqq.models.shared_result import SharedResult
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TestSharedResult(unittest.IsolatedAsyncioTestCase):
+
+    def test_shared_result_pickles_by_reference(self):
+        with SharedResult.create(b'x' * 1024) as result:
+            payload = pickle.dumps(result)
+            self.assertLess(len(payload), 256)
+
+            attached = pickle.loads(payload)
+            attached.view()[:5] = b'hello'
+            self.assertEqual(bytes(result.view()[:6]), b'hellox')
+            attached.close()
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_shared_result_numpy_array(self):
+        array = np.arange(12, dtype=np.float64).reshape(3, 4)
+        with SharedResult.create(array) as result:
+            view = result.view()
+            self.assertIsInstance(view, np.ndarray)
+            self.assertEqual(view.shape, (3, 4))
+            self.assertEqual(view.dtype, np.float64)
+            np.testing.assert_array_equal(view, array)
+
+            attached = pickle.loads(pickle.dumps(result))
+            attached_view = attached.view()
+            attached_view[0, 0] = 42
+            self.assertEqual(view[0, 0], 42)
+            del view, attached_view
+            attached.close()
+
+    async def test_asynqq_qq_returns_zero_copy_view(self):
+        asynqq = Asynqq()
+        result = SharedResult.allocate(4096)
+
+        def base_func(data):
+            result.view()[:len(data)] = data
+            return result
+
+        view = await asynqq.add(base_func, data=b'payload').qq()
+
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(bytes(view[:7]), b'payload')
+        result.view()[0:1] = b'P'
+        self.assertEqual(bytes(view[:7]), b'Payload')
+        view.release()
+        result.unlink()
+        asynqq.stop()
@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from asynqq.models.asynqq import Asynqq
+
+
+class TestTaskAdapter(unittest.IsolatedAsyncioTestCase):
+
+    async def test_task_adapter_bindings(self):
+        asynqq = Asynqq(max_workers=10)
+
+        class Work:
+            factor = 10
+
+            def __init__(self, offset):
+                self.offset = offset
+
+            @asynqq.task()
+            def method(self, value, extra=0):
+                return value + self.offset + extra
+
+            @asynqq.task()
+            async def async_method(self, value):
+                await asyncio.sleep(0)
+                return value + self.offset
+
+            @asynqq.task()
+            @classmethod
+            def class_method(cls, value):
+                return value * cls.factor
+
+            @asynqq.task()
+            @staticmethod
+            def static_method(value, extra=0):
+                return value - extra
+
+        @asynqq.task()
+        def function(a, b, c=0):
+            return a + b + c
+
+        work = Work(offset=100)
+        results = await asyncio.gather(
+            work.method.qq(1, extra=2),
+            work.async_method.qq(2),
+            work.class_method.qq(3),
+            Work.class_method.qq(4),
+            work.static_method.qq(5, extra=1),
+            Work.static_method.qq(6),
+            function.qq(1, 2, c=3),
+        )
+
+        self.assertEqual(results, [103, 102, 30, 40, 4, 6, 6])
+        self.assertEqual(function.__name__, 'function')
+        asynqq.stop()
+
+    async def test_task_adapter_skips_signature_introspection(self):
+        asynqq = Asynqq()
+
+        @asynqq.task()
+        def function(value):
+            return value
+
+        with mock.patch('inspect.signature') as signature:
+            self.assertEqual(await function.qq(1), 1)
+        signature.assert_not_called()
+        asynqq.stop()
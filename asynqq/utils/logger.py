@@ -1,12 +1,22 @@
+import atexit
 import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+_lock = threading.Lock()
+_configured = False
+_listener: Optional[QueueListener] = None
+_handlers: list[logging.Handler] = []
 
 
 def get_logger(name: str):
     """
     Get a logger with the specified name.
 
-    This function configures the logging module with a basic configuration that includes a format for the log messages,
-    a log level, and a date format. It then returns a logger with the specified name.
+    On the first call, this function configures the logging module with a basic configuration that includes
+    a format for the log messages, a log level, and a date format. It then returns a logger with the specified name.
 
     Parameters:
     :param name: The name of the logger.
@@ -14,9 +24,59 @@ def get_logger(name: str):
     Returns:
     :return logging.Logger: A logger with the specified name.
     """
-    logging.basicConfig(
-        format='%(asctime)s %(levelname)-8s %(message)s',
-        level=logging.INFO,
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    global _configured
+    if not _configured:
+        with _lock:
+            if not _configured:
+                logging.basicConfig(
+                    format='%(asctime)s %(levelname)-8s %(message)s',
+                    level=logging.INFO,
+                    datefmt='%Y-%m-%d %H:%M:%S'
+                )
+                _configured = True
     return logging.getLogger(name)
+
+
+def enable_async_logging() -> QueueListener:
+    """
+    Move the root handlers behind a queue, so logging threads only enqueue records
+    and a background listener thread does the formatting and the I/O.
+    Calling it again returns the running listener.
+
+    Returns:
+    :return QueueListener: The listener that dispatches the records to the root handlers.
+    """
+    global _listener
+    get_logger(__name__)
+    with _lock:
+        if _listener is None:
+            root = logging.getLogger()
+            _handlers[:] = root.handlers
+            for handler in _handlers:
+                root.removeHandler(handler)
+            records = queue.SimpleQueue()
+            root.addHandler(QueueHandler(records))
+            _listener = QueueListener(records, *_handlers, respect_handler_level=True)
+            _listener.start()
+            atexit.register(disable_async_logging)
+        return _listener
+
+
+def disable_async_logging() -> None:
+    """
+    Stop the listener after flushing the queued records, and restore the root handlers.
+    """
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            if isinstance(handler, QueueHandler):
+                root.removeHandler(handler)
+        for handler in _handlers:
+            root.addHandler(handler)
+        _handlers.clear()
+        _listener = None
+        atexit.unregister(disable_async_logging)